@@ -8,18 +8,131 @@ using the new multi-user plugin lifecycle management architecture.
 
 import json
 import logging
-import datetime
 import os
 import shutil
 import asyncio
+import copy
+import functools
+import time
+import weakref
 from pathlib import Path
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import table, column, insert, select, update, delete, bindparam, and_, func
 import structlog
 
 logger = structlog.get_logger()
 
+# Prefer orjson for JSON encoding/decoding, falling back to the standard library.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2 if pretty else None)
+
+    json_loads = json.loads
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """Hardlink a file into place, falling back to a regular copy (e.g. across filesystems)"""
+    # Never write through an existing target, which may itself be a link to the source
+    Path(target).unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+# Lightweight table constructs for the host application's plugin/module tables
+plugin_table = table(
+    "plugin",
+    *(column(name) for name in (
+        "id", "name", "description", "version", "type", "enabled", "icon", "category", "status",
+        "official", "author", "last_updated", "compatibility", "downloads", "scope",
+        "bundle_method", "bundle_location", "is_local", "long_description",
+        "config_fields", "messages", "dependencies", "created_at", "updated_at", "user_id",
+        "plugin_slug", "source_type", "source_url", "update_check_url", "last_update_check",
+        "update_available", "latest_version", "installation_type", "permissions"
+    ))
+)
+
+module_table = table(
+    "module",
+    *(column(name) for name in (
+        "id", "plugin_id", "name", "display_name", "description", "icon", "category",
+        "enabled", "priority", "props", "config_fields", "messages", "required_services",
+        "dependencies", "layout", "tags", "created_at", "updated_at", "user_id"
+    ))
+)
+
+# Prebuilt statements, compiled once by SQLAlchemy's statement cache and reused
+# across users
+_plugin_owner_clause = and_(
+    plugin_table.c.user_id == bindparam('user_id'),
+    plugin_table.c.plugin_slug == bindparam('plugin_slug')
+)
+
+_module_owner_clause = and_(
+    module_table.c.plugin_id == bindparam('plugin_id'),
+    module_table.c.user_id == bindparam('user_id')
+)
+
+# Timestamps are taken from the database clock rather than bound from Python.
+# CURRENT_TIMESTAMP is UTC on SQLite, so other stored times use UTC to match.
+INSERT_PLUGIN = insert(plugin_table).values(
+    created_at=func.current_timestamp(),
+    updated_at=func.current_timestamp(),
+    last_updated=func.current_timestamp()
+).returning(plugin_table.c.id)
+
+# No sort_by_parameter_order: it needs a Table with sentinel columns, not a
+# lightweight table(), and nothing relies on the order of the returned ids
+INSERT_MODULES = insert(module_table).values(
+    created_at=func.current_timestamp(),
+    updated_at=func.current_timestamp()
+).returning(module_table.c.id)
+
+SELECT_PLUGIN = select(
+    plugin_table.c.id, plugin_table.c.name, plugin_table.c.version,
+    plugin_table.c.enabled, plugin_table.c.created_at, plugin_table.c.updated_at
+).where(_plugin_owner_clause)
+
+DELETE_MODULES = delete(module_table).where(_module_owner_clause)
+
+DELETE_PLUGIN = delete(plugin_table).where(
+    plugin_table.c.id == bindparam('plugin_id'),
+    plugin_table.c.user_id == bindparam('user_id')
+)
+
+# PostgreSQL only: delete modules and plugin in one statement via a data-modifying CTE
+_deleted_modules_cte = DELETE_MODULES.returning(module_table.c.id).cte('deleted_module')
+DELETE_PLUGIN_WITH_MODULES = DELETE_PLUGIN.returning(
+    select(func.count()).select_from(_deleted_modules_cte).scalar_subquery().label('deleted_modules')
+)
+
+SELECT_PLUGIN_CONFIG = select(plugin_table.c.config_fields).where(_plugin_owner_clause)
+
+SELECT_MODULE_CONFIGS = select(
+    module_table.c.name, module_table.c.config_fields
+).where(_module_owner_clause)
+
+# Update binds can't reuse column names, hence the owner_id/new_config_fields names
+UPDATE_PLUGIN_CONFIG = update(plugin_table).where(
+    plugin_table.c.id == bindparam('plugin_id'),
+    plugin_table.c.user_id == bindparam('owner_id')
+).values(config_fields=bindparam('new_config_fields'))
+
+UPDATE_MODULE_CONFIG = update(module_table).where(
+    module_table.c.id == bindparam('module_id'),
+    module_table.c.user_id == bindparam('owner_id')
+).values(config_fields=bindparam('new_config_fields'))
+
 # Import the new base lifecycle manager
 try:
     # Try to import from the BrainDrive system first (when running in production)
@@ -95,6 +208,20 @@ except ImportError:
 class NetworkEyesLifecycleManager(BaseLifecycleManager):
     """Lifecycle manager for NetworkEyes plugin using new architecture"""
     
+    # Source items to copy, scanned once per process
+    # (set NETWORKEYES_RESCAN_SOURCE=1 to rescan on every install during development)
+    _source_items: Optional[list] = None
+    
+    # Per-user locks so concurrent install/delete calls for the same user don't interleave
+    _user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
+    # Short-lived LRU cache of _check_existing_plugin results per user; concurrent
+    # lookups for the same user on the same session share one in-flight query
+    EXISTING_PLUGIN_CACHE_TTL = 5.0
+    EXISTING_PLUGIN_CACHE_SIZE = 10_000
+    _existing_plugin_cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _existing_plugin_inflight: Dict[tuple, "asyncio.Task"] = {}
+    
     def __init__(self, plugins_base_dir: str = None):
         """Initialize the lifecycle manager"""
         # Define plugin-specific data
@@ -162,6 +289,18 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             }
         ]
         
+        # Pre-serialize the static JSON payloads written on every install
+        self._plugin_config_fields_json = json_dumps({})
+        self._plugin_permissions_json = json_dumps(self.plugin_data['permissions'])
+        self._module_json = [
+            {
+                field: json_dumps(module_data[field])
+                for field in ('props', 'config_fields', 'messages', 'required_services',
+                              'dependencies', 'layout', 'tags')
+            }
+            for module_data in self.module_data
+        ]
+        
         # Initialize base class with required parameters
         if plugins_base_dir:
             shared_path = Path(plugins_base_dir) / "shared" / self.plugin_data['plugin_slug'] / f"v{self.plugin_data['version']}"
@@ -189,48 +328,50 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
     
     async def _perform_user_installation(self, user_id: str, db: AsyncSession, shared_plugin_path: Path) -> Dict[str, Any]:
         """Perform user-specific installation using shared plugin path"""
-        try:
-            # Create database records for this user
-            db_result = await self._create_database_records(user_id, db)
-            if not db_result['success']:
-                return db_result
-            
-            logger.info(f"NetworkEyes: User installation completed for {user_id}")
-            return {
-                'success': True,
-                'plugin_id': db_result['plugin_id'],
-                'modules_created': db_result['modules_created']
-            }
-            
-        except Exception as e:
-            logger.error(f"NetworkEyes: User installation failed for {user_id}: {e}")
-            return {'success': False, 'error': str(e)}
+        async with self._get_user_lock(user_id):
+            try:
+                # Create database records for this user
+                db_result = await self._create_database_records(user_id, db)
+                if not db_result['success']:
+                    return db_result
+                
+                logger.info(f"NetworkEyes: User installation completed for {user_id}")
+                return {
+                    'success': True,
+                    'plugin_id': db_result['plugin_id'],
+                    'modules_created': db_result['modules_created']
+                }
+                
+            except Exception as e:
+                logger.error(f"NetworkEyes: User installation failed for {user_id}: {e}")
+                return {'success': False, 'error': str(e)}
     
     async def _perform_user_uninstallation(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Perform user-specific uninstallation"""
-        try:
-            # Check if plugin exists for user
-            existing_check = await self._check_existing_plugin(user_id, db)
-            if not existing_check['exists']:
-                return {'success': False, 'error': 'Plugin not found for user'}
-            
-            plugin_id = existing_check['plugin_id']
-            
-            # Delete database records
-            delete_result = await self._delete_database_records(user_id, plugin_id, db)
-            if not delete_result['success']:
-                return delete_result
-            
-            logger.info(f"NetworkEyes: User uninstallation completed for {user_id}")
-            return {
-                'success': True,
-                'plugin_id': plugin_id,
-                'deleted_modules': delete_result['deleted_modules']
-            }
-            
-        except Exception as e:
-            logger.error(f"NetworkEyes: User uninstallation failed for {user_id}: {e}")
-            return {'success': False, 'error': str(e)}
+        async with self._get_user_lock(user_id):
+            try:
+                # Check if plugin exists for user
+                existing_check = await self._check_existing_plugin(user_id, db)
+                if not existing_check['exists']:
+                    return {'success': False, 'error': 'Plugin not found for user'}
+                
+                plugin_id = existing_check['plugin_id']
+                
+                # Delete database records
+                delete_result = await self._delete_database_records(user_id, plugin_id, db)
+                if not delete_result['success']:
+                    return delete_result
+                
+                logger.info(f"NetworkEyes: User uninstallation completed for {user_id}")
+                return {
+                    'success': True,
+                    'plugin_id': plugin_id,
+                    'deleted_modules': delete_result['deleted_modules']
+                }
+                
+            except Exception as e:
+                logger.error(f"NetworkEyes: User uninstallation failed for {user_id}: {e}")
+                return {'success': False, 'error': str(e)}
     
     async def _copy_plugin_files_impl(self, user_id: str, target_dir: Path, update: bool = False) -> Dict[str, Any]:
         """
@@ -240,7 +381,6 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
         """
         try:
             source_dir = Path(__file__).parent
-            copied_files = []
             
             # Define files and directories to exclude (similar to build_archive.py)
             exclude_patterns = {
@@ -266,41 +406,50 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                         return False
                 return True
             
-            # Copy all files and directories recursively
-            for item in source_dir.rglob('*'):
-                # Skip the lifecycle_manager.py file itself to avoid infinite recursion
-                if item.name == 'lifecycle_manager.py' and item == Path(__file__):
-                    continue
-                    
-                # Get relative path from source directory
-                relative_path = item.relative_to(source_dir)
-                
-                # Check if we should copy this item
-                if not should_copy(relative_path):
-                    continue
-                
-                target_path = target_dir / relative_path
-                
+            def copy_item(item: Path) -> Optional[str]:
+                """Copy a single file or create a single directory, returning the copied file path"""
+                target_path = target_dir / item.relative_to(source_dir)
                 try:
                     if item.is_file():
                         # Create parent directories if they don't exist
                         target_path.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(item, target_path)
-                        copied_files.append(str(target_path))
+                        link_or_copy(item, target_path)
                         logger.info(f"NetworkEyes: Copied file {item} to {target_path}")
+                        return str(target_path)
                     elif item.is_dir():
                         # Create directory if it doesn't exist
                         target_path.mkdir(parents=True, exist_ok=True)
                         logger.info(f"NetworkEyes: Created directory {target_path}")
                 except Exception as e:
                     logger.error(f"NetworkEyes: Failed to copy {item} to {target_path}: {e}")
-                    continue
+                return None
+            
+            # Collect all files and directories to copy recursively
+            items_to_copy = NetworkEyesLifecycleManager._source_items
+            if items_to_copy is None or os.environ.get('NETWORKEYES_RESCAN_SOURCE'):
+                items_to_copy = []
+                for item in source_dir.rglob('*'):
+                    # Skip the lifecycle_manager.py file itself to avoid infinite recursion
+                    if item.name == 'lifecycle_manager.py' and item == Path(__file__):
+                        continue
+                    
+                    # Check if we should copy this item (by path relative to the source directory)
+                    if should_copy(item.relative_to(source_dir)):
+                        items_to_copy.append(item)
+                
+                NetworkEyesLifecycleManager._source_items = items_to_copy
+            
+            # Items are independent of each other, so copy them concurrently
+            copy_results = await asyncio.gather(
+                *(asyncio.to_thread(copy_item, item) for item in items_to_copy)
+            )
+            copied_files = [path for path in copy_results if path]
             
             # Copy the lifecycle_manager.py file itself
             lifecycle_manager_source = Path(__file__)
             lifecycle_manager_target = target_dir / 'lifecycle_manager.py'
             try:
-                shutil.copy2(lifecycle_manager_source, lifecycle_manager_target)
+                await asyncio.to_thread(link_or_copy, lifecycle_manager_source, lifecycle_manager_target)
                 copied_files.append(str(lifecycle_manager_target))
                 logger.info(f"NetworkEyes: Copied lifecycle_manager.py to {lifecycle_manager_target}")
             except Exception as e:
@@ -336,8 +485,7 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             # Validate package.json structure
             package_json_path = plugin_dir / "package.json"
             try:
-                with open(package_json_path, 'r') as f:
-                    package_data = json.load(f)
+                package_data = json_loads(await asyncio.to_thread(package_json_path.read_bytes))
                 
                 # Check for required package.json fields
                 required_fields = ["name", "version"]
@@ -392,8 +540,7 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             package_json_path = plugin_dir / "package.json"
             if package_json_path.exists():
                 try:
-                    with open(package_json_path, 'r') as f:
-                        json.load(f)
+                    json_loads(await asyncio.to_thread(package_json_path.read_bytes))
                     health_info['package_json_valid'] = True
                 except json.JSONDecodeError:
                     pass
@@ -422,16 +569,66 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                 'details': {'error': str(e)}
             }
     
+    @classmethod
+    def _invalidate_existing_plugin(cls, user_id: str):
+        """Drop the cached existence check for a user (call after committing changes)"""
+        cls._existing_plugin_cache.pop(user_id, None)
+        # Unregister running lookups too, so a pre-commit answer is never stored
+        for key in [key for key in cls._existing_plugin_inflight if key[0] == user_id]:
+            del cls._existing_plugin_inflight[key]
+    
+    @classmethod
+    def _store_existing_plugin(cls, key: tuple, task: "asyncio.Task"):
+        """Cache a finished lookup, unless it failed or was invalidated while running"""
+        if cls._existing_plugin_inflight.get(key) is not task:
+            return
+        del cls._existing_plugin_inflight[key]
+        
+        if task.cancelled() or task.exception() is not None or 'error' in task.result():
+            return
+        
+        user_id = key[0]
+        cls._existing_plugin_cache[user_id] = (time.monotonic() + cls.EXISTING_PLUGIN_CACHE_TTL, task.result())
+        cls._existing_plugin_cache.move_to_end(user_id)
+        while len(cls._existing_plugin_cache) > cls.EXISTING_PLUGIN_CACHE_SIZE:
+            cls._existing_plugin_cache.popitem(last=False)
+    
+    async def _commit(self, db: AsyncSession, user_id: str):
+        """Commit the session and drop the user's cached existence check"""
+        commit = asyncio.ensure_future(db.commit())
+        try:
+            await asyncio.shield(commit)
+        except asyncio.CancelledError:
+            # Don't let the caller release the user lock or close the session mid-commit
+            await asyncio.wait({commit})
+            raise
+        finally:
+            self._invalidate_existing_plugin(user_id)
+    
     async def _check_existing_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
-        """Check if plugin already exists for user"""
+        """Check if plugin already exists for user (cached for EXISTING_PLUGIN_CACHE_TTL seconds)"""
+        cls = type(self)
+        cached = cls._existing_plugin_cache.get(user_id)
+        # Callers get their own copy, so changing a response can't alter the cached entry
+        if cached and cached[0] > time.monotonic():
+            cls._existing_plugin_cache.move_to_end(user_id)
+            return copy.deepcopy(cached[1])
+        
+        # Only share a running lookup with callers on the same session. The query is not
+        # shielded, so cancelling the caller also stops it from using the session.
+        key = (user_id, db)
+        task = cls._existing_plugin_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._query_existing_plugin(user_id, db))
+            cls._existing_plugin_inflight[key] = task
+            task.add_done_callback(functools.partial(cls._store_existing_plugin, key))
+        
+        return copy.deepcopy(await task)
+    
+    async def _query_existing_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
+        """Query whether the plugin exists for user"""
         try:
-            plugin_query = text("""
-            SELECT id, name, version, enabled, created_at, updated_at
-            FROM plugin 
-            WHERE user_id = :user_id AND plugin_slug = :plugin_slug
-            """)
-            
-            result = await db.execute(plugin_query, {
+            result = await db.execute(SELECT_PLUGIN, {
                 'user_id': user_id,
                 'plugin_slug': self.plugin_data['plugin_slug']
             })
@@ -460,28 +657,10 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
     async def _create_database_records(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Create plugin and module records in database"""
         try:
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             plugin_slug = self.plugin_data['plugin_slug']
             plugin_id = f"{user_id}_{plugin_slug}"
             
-            plugin_stmt = text("""
-            INSERT INTO plugin
-            (id, name, description, version, type, enabled, icon, category, status,
-            official, author, last_updated, compatibility, downloads, scope,
-            bundle_method, bundle_location, is_local, long_description,
-            config_fields, messages, dependencies, created_at, updated_at, user_id,
-            plugin_slug, source_type, source_url, update_check_url, last_update_check,
-            update_available, latest_version, installation_type, permissions)
-            VALUES
-            (:id, :name, :description, :version, :type, :enabled, :icon, :category,
-            :status, :official, :author, :last_updated, :compatibility, :downloads,
-            :scope, :bundle_method, :bundle_location, :is_local, :long_description,
-            :config_fields, :messages, :dependencies, :created_at, :updated_at, :user_id,
-            :plugin_slug, :source_type, :source_url, :update_check_url, :last_update_check,
-            :update_available, :latest_version, :installation_type, :permissions)
-            """)
-            
-            await db.execute(plugin_stmt, {
+            result = await db.execute(INSERT_PLUGIN, {
                 'id': plugin_id,
                 'name': self.plugin_data['name'],
                 'description': self.plugin_data['description'],
@@ -493,7 +672,6 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                 'status': 'activated',
                 'official': self.plugin_data['official'],
                 'author': self.plugin_data['author'],
-                'last_updated': current_time,
                 'compatibility': self.plugin_data['compatibility'],
                 'downloads': 0,
                 'scope': self.plugin_data['scope'],
@@ -501,11 +679,9 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                 'bundle_location': self.plugin_data['bundle_location'],
                 'is_local': self.plugin_data['is_local'],
                 'long_description': self.plugin_data['long_description'],
-                'config_fields': json.dumps({}),
+                'config_fields': self._plugin_config_fields_json,
                 'messages': None,
                 'dependencies': None,
-                'created_at': current_time,
-                'updated_at': current_time,
                 'user_id': user_id,
                 'plugin_slug': plugin_slug,
                 'source_type': self.plugin_data['source_type'],
@@ -515,26 +691,14 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                 'update_available': self.plugin_data['update_available'],
                 'latest_version': self.plugin_data['latest_version'],
                 'installation_type': self.plugin_data['installation_type'],
-                'permissions': json.dumps(self.plugin_data['permissions'])
+                'permissions': self._plugin_permissions_json
             })
+            plugin_id = result.scalar_one()
             
-            modules_created = []
-            for module_data in self.module_data:
-                module_id = f"{user_id}_{plugin_slug}_{module_data['name']}"
-                
-                module_stmt = text("""
-                INSERT INTO module
-                (id, plugin_id, name, display_name, description, icon, category,
-                enabled, priority, props, config_fields, messages, required_services,
-                dependencies, layout, tags, created_at, updated_at, user_id)
-                VALUES
-                (:id, :plugin_id, :name, :display_name, :description, :icon, :category,
-                :enabled, :priority, :props, :config_fields, :messages, :required_services,
-                :dependencies, :layout, :tags, :created_at, :updated_at, :user_id)
-                """)
-                
-                await db.execute(module_stmt, {
-                    'id': module_id,
+            # Build all module rows up front so they go out as a single executemany
+            module_params = [
+                {
+                    'id': f"{user_id}_{plugin_slug}_{module_data['name']}",
                     'plugin_id': plugin_id,
                     'name': module_data['name'],
                     'display_name': module_data['display_name'],
@@ -543,22 +707,25 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
                     'category': module_data['category'],
                     'enabled': True,
                     'priority': module_data['priority'],
-                    'props': json.dumps(module_data['props']),
-                    'config_fields': json.dumps(module_data['config_fields']),
-                    'messages': json.dumps(module_data['messages']),
-                    'required_services': json.dumps(module_data['required_services']),
-                    'dependencies': json.dumps(module_data['dependencies']),
-                    'layout': json.dumps(module_data['layout']),
-                    'tags': json.dumps(module_data['tags']),
-                    'created_at': current_time,
-                    'updated_at': current_time,
+                    'props': module_json['props'],
+                    'config_fields': module_json['config_fields'],
+                    'messages': module_json['messages'],
+                    'required_services': module_json['required_services'],
+                    'dependencies': module_json['dependencies'],
+                    'layout': module_json['layout'],
+                    'tags': module_json['tags'],
                     'user_id': user_id
-                })
-                
-                modules_created.append(module_id)
+                }
+                for module_data, module_json in zip(self.module_data, self._module_json)
+            ]
+            
+            modules_created = []
+            if module_params:
+                result = await db.execute(INSERT_MODULES, module_params)
+                modules_created = list(result.scalars().all())
             
             # Commit the transaction to persist changes
-            await db.commit()
+            await self._commit(db, user_id)
             
             logger.info(f"Created database records for plugin {plugin_id} with {len(modules_created)} modules")
             return {'success': True, 'plugin_id': plugin_id, 'modules_created': modules_created}
@@ -569,36 +736,42 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             await db.rollback()
             return {'success': False, 'error': str(e)}
     
+    def _supports_delete_cte(self, db: AsyncSession) -> bool:
+        """Check if the database supports DELETE ... RETURNING inside a CTE (PostgreSQL only)"""
+        try:
+            return db.get_bind().dialect.name == 'postgresql'
+        except Exception:
+            return False
+    
     async def _delete_database_records(self, user_id: str, plugin_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Delete plugin and module records from database"""
         try:
-            module_delete_stmt = text("""
-            DELETE FROM module 
-            WHERE plugin_id = :plugin_id AND user_id = :user_id
-            """)
-            
-            module_result = await db.execute(module_delete_stmt, {
+            delete_params = {
                 'plugin_id': plugin_id,
                 'user_id': user_id
-            })
-            
-            deleted_modules = module_result.rowcount
-            
-            plugin_delete_stmt = text("""
-            DELETE FROM plugin 
-            WHERE id = :plugin_id AND user_id = :user_id
-            """)
-            
-            plugin_result = await db.execute(plugin_delete_stmt, {
-                'plugin_id': plugin_id,
-                'user_id': user_id
-            })
+            }
             
-            if plugin_result.rowcount == 0:
-                return {'success': False, 'error': 'Plugin not found or not owned by user'}
+            if self._supports_delete_cte(db):
+                # Delete modules and plugin in a single round-trip
+                delete_result = await db.execute(DELETE_PLUGIN_WITH_MODULES, delete_params)
+                
+                delete_row = delete_result.fetchone()
+                if delete_row is None:
+                    return {'success': False, 'error': 'Plugin not found or not owned by user'}
+                
+                deleted_modules = delete_row.deleted_modules
+            else:
+                module_result = await db.execute(DELETE_MODULES, delete_params)
+                
+                deleted_modules = module_result.rowcount
+                
+                plugin_result = await db.execute(DELETE_PLUGIN, delete_params)
+                
+                if plugin_result.rowcount == 0:
+                    return {'success': False, 'error': 'Plugin not found or not owned by user'}
             
             # Commit the transaction to persist changes
-            await db.commit()
+            await self._commit(db, user_id)
             
             logger.info(f"Deleted database records for plugin {plugin_id} ({deleted_modules} modules)")
             return {'success': True, 'deleted_modules': deleted_modules}
@@ -623,13 +796,7 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             }
             
             # Export user-specific plugin configuration
-            from sqlalchemy import text
-            plugin_query = text("""
-            SELECT config_fields FROM plugin
-            WHERE user_id = :user_id AND plugin_slug = :plugin_slug
-            """)
-            
-            result = await db.execute(plugin_query, {
+            result = await db.execute(SELECT_PLUGIN_CONFIG, {
                 'user_id': user_id,
                 'plugin_slug': self.plugin_data['plugin_slug']
             })
@@ -637,19 +804,13 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             plugin_row = result.fetchone()
             if plugin_row and plugin_row.config_fields:
                 try:
-                    import json
-                    user_data['user_config'] = json.loads(plugin_row.config_fields)
+                    user_data['user_config'] = json_loads(plugin_row.config_fields)
                 except (json.JSONDecodeError, TypeError):
                     user_data['user_config'] = {}
             
             # Export module-specific configurations
-            module_query = text("""
-            SELECT name, config_fields FROM module
-            WHERE plugin_id = :plugin_id AND user_id = :user_id
-            """)
-            
             plugin_id = f"{user_id}_{self.plugin_data['plugin_slug']}"
-            result = await db.execute(module_query, {
+            result = await db.execute(SELECT_MODULE_CONFIGS, {
                 'plugin_id': plugin_id,
                 'user_id': user_id
             })
@@ -658,8 +819,7 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
             for module in modules:
                 if module.config_fields:
                     try:
-                        import json
-                        user_data['module_configs'][module.name] = json.loads(module.config_fields)
+                        user_data['module_configs'][module.name] = json_loads(module.config_fields)
                     except (json.JSONDecodeError, TypeError):
                         user_data['module_configs'][module.name] = {}
             
@@ -683,37 +843,21 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
         try:
             # Import user plugin configuration
             if user_data.get('user_config'):
-                from sqlalchemy import text
-                import json
-                
                 plugin_id = f"{user_id}_{self.plugin_data['plugin_slug']}"
-                update_plugin_query = text("""
-                UPDATE plugin SET config_fields = :config_fields
-                WHERE id = :plugin_id AND user_id = :user_id
-                """)
-                
-                await db.execute(update_plugin_query, {
-                    'config_fields': json.dumps(user_data['user_config']),
+                await db.execute(UPDATE_PLUGIN_CONFIG, {
+                    'new_config_fields': json_dumps(user_data['user_config']),
                     'plugin_id': plugin_id,
-                    'user_id': user_id
+                    'owner_id': user_id
                 })
             
             # Import module configurations
             if user_data.get('module_configs'):
-                from sqlalchemy import text
-                import json
-                
                 for module_name, module_config in user_data['module_configs'].items():
                     module_id = f"{user_id}_{self.plugin_data['plugin_slug']}_{module_name}"
-                    update_module_query = text("""
-                    UPDATE module SET config_fields = :config_fields
-                    WHERE id = :module_id AND user_id = :user_id
-                    """)
-                    
-                    await db.execute(update_module_query, {
-                        'config_fields': json.dumps(module_config),
+                    await db.execute(UPDATE_MODULE_CONFIG, {
+                        'new_config_fields': json_dumps(module_config),
                         'module_id': module_id,
-                        'user_id': user_id
+                        'owner_id': user_id
                     })
             
             logger.info(f"NetworkEyes: Imported user data for {user_id} after update")
@@ -741,13 +885,22 @@ class NetworkEyesLifecycleManager(BaseLifecycleManager):
         """Compatibility property for remote installer"""
         return self.plugin_data
     
+    @classmethod
+    def _get_user_lock(cls, user_id: str) -> asyncio.Lock:
+        """Get the lock serializing install/delete operations for a user"""
+        lock = cls._user_locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            cls._user_locks[user_id] = lock
+        return lock
+    
     # Compatibility methods for old interface (for testing)
     async def install_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Install NetworkEyes plugin for specific user (compatibility method)"""
         try:
             # For testing, we'll use a mock shared path
             shared_path = self.shared_path
-            shared_path.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(shared_path.mkdir, parents=True, exist_ok=True)
             
             # Copy files to shared path for testing
             copy_result = await self._copy_plugin_files_impl(user_id, shared_path)
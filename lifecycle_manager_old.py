@@ -10,19 +10,188 @@ import json
 import logging
 import datetime
 import os
+import io
 import shutil
+import tarfile
+import tempfile
 import asyncio
+import contextlib
+import weakref
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import table, column, insert, select, delete, bindparam, and_, case, func
 import structlog
 
 logger = structlog.get_logger()
 
+# Prefer orjson for JSON encoding/decoding, falling back to the standard library.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared.
+try:
+    import orjson
+    
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+    
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2 if pretty else None)
+    
+    json_loads = json.loads
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """Hardlink a file into place, falling back to a regular copy (e.g. across filesystems)"""
+    # Never write through an existing target, which may itself be a link to the source
+    Path(target).unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def build_source_archive(source_dir: Path, names: List[str]) -> bytes:
+    """Pack the named files/directories under source_dir into an uncompressed in-memory tar"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name in names:
+            tar.add(source_dir / name, arcname=name)
+    return buffer.getvalue()
+
+
+def extract_archive(archive: bytes, target_dir: Path) -> None:
+    """Stream an in-memory tar into target_dir, merging with what is already there"""
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r|') as tar:
+        if hasattr(tarfile, 'data_filter'):
+            tar.extraction_filter = tarfile.data_filter
+        for member in tar:
+            if not member.isdir():
+                # Never write through an existing target, which may be a hardlink to the source
+                (Path(target_dir) / member.name).unlink(missing_ok=True)
+            tar.extract(member, target_dir)
+
+# Lightweight table constructs for the host application's plugin/module tables
+plugin_table = table(
+    "plugin",
+    *(column(name) for name in (
+        "id", "name", "description", "version", "type", "enabled", "icon", "category", "status",
+        "official", "author", "last_updated", "compatibility", "downloads", "scope",
+        "bundle_method", "bundle_location", "is_local", "long_description",
+        "config_fields", "messages", "dependencies", "created_at", "updated_at", "user_id",
+        "plugin_slug", "source_type", "source_url", "update_check_url", "last_update_check",
+        "update_available", "latest_version", "installation_type", "permissions"
+    ))
+)
+
+module_table = table(
+    "module",
+    *(column(name) for name in (
+        "id", "plugin_id", "name", "display_name", "description", "icon", "category",
+        "enabled", "priority", "props", "config_fields", "messages", "required_services",
+        "dependencies", "layout", "tags", "created_at", "updated_at", "user_id"
+    ))
+)
+
+# Prebuilt statements, compiled once by SQLAlchemy's statement cache and reused
+# across users
+_plugin_owner_clause = and_(
+    plugin_table.c.user_id == bindparam('user_id'),
+    plugin_table.c.plugin_slug == bindparam('plugin_slug')
+)
+
+_module_owner_clause = and_(
+    module_table.c.plugin_id == bindparam('plugin_id'),
+    module_table.c.user_id == bindparam('user_id')
+)
+
+# Timestamps are taken from the database clock rather than bound from Python.
+# CURRENT_TIMESTAMP is UTC on SQLite, so other stored times use UTC to match.
+INSERT_PLUGIN = insert(plugin_table).values(
+    created_at=func.current_timestamp(),
+    updated_at=func.current_timestamp(),
+    last_updated=func.current_timestamp()
+).returning(plugin_table.c.id)
+
+# No sort_by_parameter_order: it needs a Table with sentinel columns, not a
+# lightweight table(), and nothing relies on the order of the returned ids
+INSERT_MODULES = insert(module_table).values(
+    created_at=func.current_timestamp(),
+    updated_at=func.current_timestamp()
+).returning(module_table.c.id)
+
+SELECT_PLUGIN = select(
+    plugin_table.c.id, plugin_table.c.name, plugin_table.c.version,
+    plugin_table.c.enabled, plugin_table.c.created_at, plugin_table.c.updated_at
+).where(_plugin_owner_clause)
+
+DELETE_MODULES = delete(module_table).where(_module_owner_clause)
+
+DELETE_PLUGIN = delete(plugin_table).where(
+    plugin_table.c.id == bindparam('plugin_id'),
+    plugin_table.c.user_id == bindparam('user_id')
+)
+
+# Batch variants covering one plugin slug for many users
+_users_plugin_clause = and_(
+    plugin_table.c.plugin_slug == bindparam('plugin_slug'),
+    plugin_table.c.user_id.in_(bindparam('user_ids', expanding=True))
+)
+
+DELETE_USERS_MODULES = delete(module_table).where(
+    module_table.c.user_id.in_(bindparam('user_ids', expanding=True)),
+    module_table.c.plugin_id.in_(select(plugin_table.c.id).where(_users_plugin_clause))
+)
+
+DELETE_USERS_PLUGINS = delete(plugin_table).where(_users_plugin_clause).returning(
+    plugin_table.c.id, plugin_table.c.user_id
+)
+
+# PostgreSQL only: delete modules and plugin in one statement via a data-modifying CTE
+_deleted_modules_cte = DELETE_MODULES.returning(module_table.c.id).cte('deleted_module')
+DELETE_PLUGIN_WITH_MODULES = DELETE_PLUGIN.returning(
+    select(func.count()).select_from(_deleted_modules_cte).scalar_subquery().label('deleted_modules')
+)
+
+SELECT_PLUGIN_STATUS = select(
+    plugin_table.c.id, plugin_table.c.name, plugin_table.c.version,
+    plugin_table.c.enabled, plugin_table.c.created_at, plugin_table.c.updated_at,
+    func.count(module_table.c.id).label('module_count'),
+    func.sum(case((module_table.c.enabled, 1), else_=0)).label('enabled_count')
+).select_from(
+    plugin_table.outerjoin(module_table, and_(
+        module_table.c.plugin_id == plugin_table.c.id,
+        module_table.c.user_id == plugin_table.c.user_id
+    ))
+).where(_plugin_owner_clause).group_by(
+    plugin_table.c.id, plugin_table.c.name, plugin_table.c.version,
+    plugin_table.c.enabled, plugin_table.c.created_at, plugin_table.c.updated_at
+)
+
+SELECT_MODULES = select(
+    module_table.c.id, module_table.c.name, module_table.c.enabled
+).where(_module_owner_clause)
+
 class NetworkEyesLifecycleManager:
     """Lifecycle manager for NetworkEyes plugin"""
     
+    # Directory under plugins_base_dir holding storage shared by all users; user directories
+    # live alongside it, so it is reserved as a user id
+    SHARED_DIR = "shared"
+    
+    SOURCE_FILES = ("package.json", "README.md")
+    SOURCE_DIRS = ("dist", "src", "public")
+    
+    # Source entries present on disk, scanned once per process
+    # (set NETWORKEYES_RESCAN_SOURCE=1 to rescan on every install during development)
+    _source_manifest: Optional[Dict[str, List[str]]] = None
+    
+    # Source entries packed into a tar, built on first use when files can't be hardlinked
+    _source_archive: Optional[bytes] = None
+    
+    # Per-user locks so concurrent install/delete calls for the same user don't interleave
+    _user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+    
     def __init__(self, plugins_base_dir: str = None):
         """Initialize the lifecycle manager"""
         if plugins_base_dir:
@@ -93,99 +262,203 @@ class NetworkEyesLifecycleManager:
                 "tags": ["monitoring", "network", "status", "connectivity", "eyes"]
             }
         ]
+        
+        # Pre-serialize the static JSON payloads written on every install
+        self._plugin_config_fields_json = json_dumps({})
+        self._plugin_permissions_json = json_dumps(self.PLUGIN_DATA['permissions'])
+        self._module_json = [
+            {
+                field: json_dumps(module_data[field])
+                for field in ('props', 'config_fields', 'messages', 'required_services',
+                              'dependencies', 'layout', 'tags')
+            }
+            for module_data in self.MODULE_DATA
+        ]
+        
+        # Static metadata shared by all users, rewritten only when missing or stale
+        # (same shared/<slug>/v<version> layout as the new-architecture manager)
+        self.shared_metadata_file = (self.plugins_base_dir / self.SHARED_DIR / self.PLUGIN_DATA['plugin_slug']
+                                     / f"v{self.PLUGIN_DATA['version']}" / "plugin_metadata.json")
+    
+    @classmethod
+    def _get_user_lock(cls, user_id: str) -> asyncio.Lock:
+        """Get the lock serializing install/delete operations for a user"""
+        lock = cls._user_locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            cls._user_locks[user_id] = lock
+        return lock
+    
+    async def _commit(self, db: AsyncSession):
+        """Commit the session, letting the commit finish even if the caller is cancelled"""
+        commit = asyncio.ensure_future(db.commit())
+        try:
+            await asyncio.shield(commit)
+        except asyncio.CancelledError:
+            # Don't let the caller release the user lock or close the session mid-commit
+            await asyncio.wait({commit})
+            raise
     
     async def install_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Install NetworkEyes plugin for specific user"""
-        try:
-            logger.info(f"Installing NetworkEyes plugin for user {user_id}")
-            
-            existing_check = await self._check_existing_plugin(user_id, db)
-            if existing_check['exists']:
+        if user_id == self.SHARED_DIR:
+            return {'success': False, 'error': f"User id '{user_id}' is reserved"}
+        
+        async with self._get_user_lock(user_id):
+            try:
+                logger.info(f"Installing NetworkEyes plugin for user {user_id}")
+                
+                existing_check = await self._check_existing_plugin(user_id, db)
+                if existing_check['exists']:
+                    return {
+                        'success': False, 
+                        'error': f"Plugin already installed for user {user_id}",
+                        'plugin_id': existing_check['plugin_id']
+                    }
+                
+                user_plugin_dir = self.plugins_base_dir / user_id / self.PLUGIN_DATA['plugin_slug']
+                
+                # File preparation and record creation are independent until validation,
+                # so run them concurrently
+                files_result, db_result = await asyncio.gather(
+                    self._prepare_files(user_id),
+                    self._create_database_records(user_id, db),
+                    return_exceptions=True
+                )
+                
+                for step_result in (files_result, db_result):
+                    if isinstance(step_result, BaseException) or not step_result['success']:
+                        await db.rollback()
+                        await self._cleanup_user_directory(user_plugin_dir)
+                        if isinstance(step_result, BaseException):
+                            return {'success': False, 'error': str(step_result)}
+                        return step_result
+                
+                validation = await self._validate_installation(user_id, user_plugin_dir)
+                if not validation['valid']:
+                    await db.rollback()
+                    await self._cleanup_user_directory(user_plugin_dir)
+                    return {'success': False, 'error': validation['error']}
+                
+                await self._commit(db)
+                logger.info(f"NetworkEyes plugin installed successfully for user {user_id}")
+                
                 return {
-                    'success': False, 
-                    'error': f"Plugin already installed for user {user_id}",
-                    'plugin_id': existing_check['plugin_id']
+                    'success': True,
+                    'plugin_id': db_result['plugin_id'],
+                    'plugin_slug': self.PLUGIN_DATA['plugin_slug'],
+                    'modules_created': db_result['modules_created'],
+                    'plugin_directory': str(user_plugin_dir)
                 }
-            
-            user_plugin_dir = await self._create_user_plugin_directory(user_id)
-            if not user_plugin_dir:
-                return {'success': False, 'error': 'Failed to create user plugin directory'}
-            
-            copy_result = await self._copy_plugin_files(user_id, user_plugin_dir)
-            if not copy_result['success']:
-                await self._cleanup_user_directory(user_plugin_dir)
-                return copy_result
-            
-            db_result = await self._create_database_records(user_id, db)
-            if not db_result['success']:
-                await self._cleanup_user_directory(user_plugin_dir)
-                return db_result
-            
-            validation = await self._validate_installation(user_id, user_plugin_dir)
-            if not validation['valid']:
+                
+            except Exception as e:
+                logger.error(f"Plugin installation failed for user {user_id}: {e}")
                 await db.rollback()
-                await self._cleanup_user_directory(user_plugin_dir)
-                return {'success': False, 'error': validation['error']}
-            
-            await db.commit()
-            logger.info(f"NetworkEyes plugin installed successfully for user {user_id}")
-            
-            return {
-                'success': True,
-                'plugin_id': db_result['plugin_id'],
-                'plugin_slug': self.PLUGIN_DATA['plugin_slug'],
-                'modules_created': db_result['modules_created'],
-                'plugin_directory': str(user_plugin_dir)
-            }
-            
-        except Exception as e:
-            logger.error(f"Plugin installation failed for user {user_id}: {e}")
-            await db.rollback()
-            return {'success': False, 'error': str(e)}
+                return {'success': False, 'error': str(e)}
     
     async def delete_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Delete NetworkEyes plugin for user"""
-        try:
-            logger.info(f"Deleting NetworkEyes plugin for user {user_id}")
-            
-            existing_check = await self._check_existing_plugin(user_id, db)
-            if not existing_check['exists']:
-                return {'success': False, 'error': 'Plugin not found for user'}
-            
-            plugin_id = existing_check['plugin_id']
-            
-            delete_result = await self._delete_database_records(user_id, plugin_id, db)
-            if not delete_result['success']:
-                return delete_result
+        async with self._get_user_lock(user_id):
+            try:
+                logger.info(f"Deleting NetworkEyes plugin for user {user_id}")
+                
+                existing_check = await self._check_existing_plugin(user_id, db)
+                if not existing_check['exists']:
+                    return {'success': False, 'error': 'Plugin not found for user'}
+                
+                plugin_id = existing_check['plugin_id']
+                
+                delete_result = await self._delete_database_records(user_id, plugin_id, db)
+                if not delete_result['success']:
+                    return delete_result
+                
+                user_plugin_dir = self.plugins_base_dir / user_id / self.PLUGIN_DATA['plugin_slug']
+                await self._cleanup_user_directory(user_plugin_dir)
+                
+                await self._commit(db)
+                logger.info(f"NetworkEyes plugin deleted successfully for user {user_id}")
+                
+                return {
+                    'success': True,
+                    'plugin_id': plugin_id,
+                    'deleted_modules': delete_result['deleted_modules']
+                }
+                
+            except Exception as e:
+                logger.error(f"Plugin deletion failed for user {user_id}: {e}")
+                await db.rollback()
+                return {'success': False, 'error': str(e)}
+    
+    async def delete_plugins(self, user_ids: List[str], db: AsyncSession) -> Dict[str, Any]:
+        """Delete NetworkEyes plugin for many users in one batch"""
+        user_ids = sorted(set(user_ids))
+        
+        # Take the per-user locks in a fixed order so concurrent batches can't deadlock
+        async with contextlib.AsyncExitStack() as user_locks:
+            for user_id in user_ids:
+                await user_locks.enter_async_context(self._get_user_lock(user_id))
             
+            try:
+                logger.info(f"Deleting NetworkEyes plugin for {len(user_ids)} users")
+                
+                delete_params = {
+                    'user_ids': user_ids,
+                    'plugin_slug': self.PLUGIN_DATA['plugin_slug']
+                }
+                
+                module_result = await db.execute(DELETE_USERS_MODULES, delete_params)
+                deleted_modules = module_result.rowcount
+                
+                plugin_result = await db.execute(DELETE_USERS_PLUGINS, delete_params)
+                deleted_plugins = plugin_result.fetchall()
+                
+                await self._commit(db)
+                
+                # Remove every requested user's directory, including leftovers from failed
+                # installs without a plugin row; removals are independent, so run them concurrently
+                await asyncio.gather(*(
+                    self._cleanup_user_directory(self.plugins_base_dir / user_id / self.PLUGIN_DATA['plugin_slug'])
+                    for user_id in user_ids
+                ))
+                
+                logger.info(f"NetworkEyes plugin deleted for {len(deleted_plugins)} of {len(user_ids)} users")
+                
+                return {
+                    'success': True,
+                    'plugin_ids': [row.id for row in deleted_plugins],
+                    'deleted_modules': deleted_modules,
+                    'not_found': sorted(set(user_ids) - {row.user_id for row in deleted_plugins})
+                }
+                
+            except Exception as e:
+                logger.error(f"Batch plugin deletion failed: {e}")
+                await db.rollback()
+                return {'success': False, 'error': str(e)}
+    
+    async def get_plugin_status(self, user_id: str, db: AsyncSession, include_modules: bool = False) -> Dict[str, Any]:
+        """Get current status of NetworkEyes plugin installation (per-module details only if include_modules)"""
+        try:
             user_plugin_dir = self.plugins_base_dir / user_id / self.PLUGIN_DATA['plugin_slug']
-            await self._cleanup_user_directory(user_plugin_dir)
             
-            await db.commit()
-            logger.info(f"NetworkEyes plugin deleted successfully for user {user_id}")
+            # Fetch plugin and module counts in one query while checking the directory
+            result, files_exist = await asyncio.gather(
+                db.execute(SELECT_PLUGIN_STATUS, {
+                    'user_id': user_id,
+                    'plugin_slug': self.PLUGIN_DATA['plugin_slug']
+                }),
+                asyncio.to_thread(user_plugin_dir.exists)
+            )
             
-            return {
-                'success': True,
-                'plugin_id': plugin_id,
-                'deleted_modules': delete_result['deleted_modules']
-            }
-            
-        except Exception as e:
-            logger.error(f"Plugin deletion failed for user {user_id}: {e}")
-            await db.rollback()
-            return {'success': False, 'error': str(e)}
-    
-    async def get_plugin_status(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
-        """Get current status of NetworkEyes plugin installation"""
-        try:
-            existing_check = await self._check_existing_plugin(user_id, db)
-            if not existing_check['exists']:
+            plugin_row = result.fetchone()
+            if not plugin_row:
                 return {'exists': False, 'status': 'not_installed'}
             
-            plugin_id = existing_check['plugin_id']
-            user_plugin_dir = self.plugins_base_dir / user_id / self.PLUGIN_DATA['plugin_slug']
-            files_exist = user_plugin_dir.exists()
-            modules_status = await self._check_modules_status(user_id, plugin_id, db)
+            plugin_id = plugin_row.id
+            if include_modules:
+                # Module counts come from the status query; only fetch rows when details are wanted
+                modules_status = await self._check_modules_status(user_id, plugin_id, db)
+            else:
+                modules_status = self._summarize_modules(plugin_row.module_count, plugin_row.enabled_count or 0)
             
             if files_exist and modules_status['all_loaded']:
                 status = 'healthy'
@@ -200,7 +473,14 @@ class NetworkEyesLifecycleManager:
                 'exists': True,
                 'status': status,
                 'plugin_id': plugin_id,
-                'plugin_info': existing_check['plugin_info'],
+                'plugin_info': {
+                    'id': plugin_row.id,
+                    'name': plugin_row.name,
+                    'version': plugin_row.version,
+                    'enabled': plugin_row.enabled,
+                    'created_at': plugin_row.created_at,
+                    'updated_at': plugin_row.updated_at
+                },
                 'files_exist': files_exist,
                 'modules_status': modules_status,
                 'plugin_directory': str(user_plugin_dir)
@@ -216,13 +496,7 @@ class NetworkEyesLifecycleManager:
     async def _check_existing_plugin(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Check if plugin already exists for user"""
         try:
-            plugin_query = text("""
-            SELECT id, name, version, enabled, created_at, updated_at
-            FROM plugin 
-            WHERE user_id = :user_id AND plugin_slug = :plugin_slug
-            """)
-            
-            result = await db.execute(plugin_query, {
+            result = await db.execute(SELECT_PLUGIN, {
                 'user_id': user_id,
                 'plugin_slug': self.PLUGIN_DATA['plugin_slug']
             })
@@ -254,9 +528,9 @@ class NetworkEyesLifecycleManager:
             user_dir = self.plugins_base_dir / user_id
             plugin_dir = user_dir / self.PLUGIN_DATA['plugin_slug']
             
-            plugin_dir.mkdir(parents=True, exist_ok=True)
-            (plugin_dir / "dist").mkdir(exist_ok=True)
-            (plugin_dir / "assets").mkdir(exist_ok=True)
+            await asyncio.to_thread(plugin_dir.mkdir, parents=True, exist_ok=True)
+            await asyncio.to_thread((plugin_dir / "dist").mkdir, exist_ok=True)
+            await asyncio.to_thread((plugin_dir / "assets").mkdir, exist_ok=True)
             
             logger.info(f"Created plugin directory: {plugin_dir}")
             return plugin_dir
@@ -265,42 +539,129 @@ class NetworkEyesLifecycleManager:
             logger.error(f"Error creating user plugin directory: {e}")
             return None
     
+    async def _prepare_files(self, user_id: str) -> Dict[str, Any]:
+        """Create user plugin directory and copy plugin files into it"""
+        user_plugin_dir = await self._create_user_plugin_directory(user_id)
+        if not user_plugin_dir:
+            return {'success': False, 'error': 'Failed to create user plugin directory'}
+        
+        copy_result = await self._copy_plugin_files(user_id, user_plugin_dir)
+        if not copy_result['success']:
+            return copy_result
+        
+        return {'success': True, 'plugin_directory': user_plugin_dir, 'copied_files': copy_result['copied_files']}
+    
+    @classmethod
+    def _get_source_manifest(cls, source_dir: Path) -> Dict[str, List[str]]:
+        """Get the plugin source files and directories present on disk"""
+        if cls._source_manifest is None or os.environ.get('NETWORKEYES_RESCAN_SOURCE'):
+            present_files = set()
+            present_dirs = set()
+            with os.scandir(source_dir) as entries:
+                for entry in entries:
+                    if entry.name in cls.SOURCE_FILES and entry.is_file():
+                        present_files.add(entry.name)
+                    elif entry.name in cls.SOURCE_DIRS and entry.is_dir():
+                        present_dirs.add(entry.name)
+            
+            cls._source_manifest = {
+                'files': [name for name in cls.SOURCE_FILES if name in present_files],
+                'dirs': [name for name in cls.SOURCE_DIRS if name in present_dirs]
+            }
+        
+        return cls._source_manifest
+    
+    @staticmethod
+    def _same_filesystem(source_dir: Path, target_dir: Path) -> bool:
+        """Check whether files can be hardlinked from source_dir into target_dir"""
+        return os.stat(source_dir).st_dev == os.stat(target_dir).st_dev
+    
+    @classmethod
+    def _get_source_archive(cls, source_dir: Path) -> bytes:
+        """Get the plugin source entries packed into an in-memory tar"""
+        if cls._source_archive is None or os.environ.get('NETWORKEYES_RESCAN_SOURCE'):
+            source_manifest = cls._get_source_manifest(source_dir)
+            cls._source_archive = build_source_archive(source_dir, source_manifest['files'] + source_manifest['dirs'])
+        
+        return cls._source_archive
+    
+    def _ensure_shared_metadata(self):
+        """Write the shared plugin/module metadata file if it is missing or stale"""
+        metadata = json_dumps({
+            'plugin_data': self.PLUGIN_DATA,
+            'module_data': self.MODULE_DATA
+        }, pretty=True).encode()
+        
+        try:
+            if self.shared_metadata_file.read_bytes() == metadata:
+                return
+        except FileNotFoundError:
+            pass
+        
+        # Write to a temporary file and rename it so concurrent installs never see a partial file
+        self.shared_metadata_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.shared_metadata_file.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(metadata)
+            os.replace(temp_path, self.shared_metadata_file)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+        logger.info(f"Wrote shared plugin metadata: {self.shared_metadata_file}")
+    
     async def _copy_plugin_files(self, user_id: str, target_dir: Path, update: bool = False) -> Dict[str, Any]:
         """Copy plugin files from source to user directory"""
         try:
             source_dir = Path(__file__).parent
+            source_manifest = self._get_source_manifest(source_dir)
             
-            files_to_copy = ["package.json", "README.md"]
-            dirs_to_copy = ["dist", "src", "public"]
-            copied_files = []
-            
-            for file_path in files_to_copy:
-                source_file = source_dir / file_path
+            def copy_file(file_path: str) -> str:
+                """Copy a single file"""
                 target_file = target_dir / file_path
-                
-                if source_file.exists():
-                    target_file.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(source_file, target_file)
-                    copied_files.append(str(file_path))
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(source_dir / file_path, target_file)
+                return str(file_path)
             
-            for dir_path in dirs_to_copy:
-                source_dir_path = source_dir / dir_path
+            def copy_dir(dir_path: str) -> str:
+                """Copy a single directory tree"""
                 target_dir_path = target_dir / dir_path
-                
-                if source_dir_path.exists():
-                    if target_dir_path.exists() and update:
-                        shutil.rmtree(target_dir_path)
-                    shutil.copytree(source_dir_path, target_dir_path, dirs_exist_ok=True)
-                    copied_files.append(f"{dir_path}/")
+                if target_dir_path.exists() and update:
+                    shutil.rmtree(target_dir_path)
+                shutil.copytree(source_dir / dir_path, target_dir_path,
+                                copy_function=link_or_copy, dirs_exist_ok=True)
+                return f"{dir_path}/"
+            
+            def extract_source():
+                """Extract the preloaded archive into the target, merging like copy_dir does"""
+                if update:
+                    for dir_path in source_manifest['dirs']:
+                        shutil.rmtree(target_dir / dir_path, ignore_errors=True)
+                extract_archive(self._get_source_archive(source_dir), target_dir)
+            
+            if await asyncio.to_thread(self._same_filesystem, source_dir, target_dir):
+                # Entries are independent of each other, so hardlink them concurrently
+                copied_files = list(await asyncio.gather(
+                    *(asyncio.to_thread(copy_file, file_path) for file_path in source_manifest['files']),
+                    *(asyncio.to_thread(copy_dir, dir_path) for dir_path in source_manifest['dirs'])
+                ))
+            else:
+                # Hardlinks can't cross filesystems; extract everything in one sequential pass instead
+                await asyncio.to_thread(extract_source)
+                copied_files = source_manifest['files'] + [f"{dir_path}/" for dir_path in source_manifest['dirs']]
+            
+            # Checked on every install so a removed or stale shared file is restored
+            await asyncio.to_thread(self._ensure_shared_metadata)
             
+            # Static plugin/module metadata lives in the shared file, the user copy is only a marker
             metadata_file = target_dir / "plugin_metadata.json"
-            with open(metadata_file, 'w') as f:
-                json.dump({
-                    'plugin_data': self.PLUGIN_DATA,
-                    'module_data': self.MODULE_DATA,
-                    'installed_for_user': user_id,
-                    'installed_at': datetime.datetime.now().isoformat()
-                }, f, indent=2)
+            metadata = json_dumps({
+                'installed_for_user': user_id,
+                'installed_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'version': self.PLUGIN_DATA['version'],
+                'shared_metadata': str(self.shared_metadata_file)
+            })
+            await asyncio.to_thread(metadata_file.write_text, metadata)
             copied_files.append("plugin_metadata.json")
             
             logger.info(f"Copied {len(copied_files)} files/directories to {target_dir}")
@@ -313,28 +674,10 @@ class NetworkEyesLifecycleManager:
     async def _create_database_records(self, user_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Create plugin and module records in database"""
         try:
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             plugin_slug = self.PLUGIN_DATA['plugin_slug']
             plugin_id = f"{user_id}_{plugin_slug}"
             
-            plugin_stmt = text("""
-            INSERT INTO plugin
-            (id, name, description, version, type, enabled, icon, category, status,
-            official, author, last_updated, compatibility, downloads, scope,
-            bundle_method, bundle_location, is_local, long_description,
-            config_fields, messages, dependencies, created_at, updated_at, user_id,
-            plugin_slug, source_type, source_url, update_check_url, last_update_check,
-            update_available, latest_version, installation_type, permissions)
-            VALUES
-            (:id, :name, :description, :version, :type, :enabled, :icon, :category,
-            :status, :official, :author, :last_updated, :compatibility, :downloads,
-            :scope, :bundle_method, :bundle_location, :is_local, :long_description,
-            :config_fields, :messages, :dependencies, :created_at, :updated_at, :user_id,
-            :plugin_slug, :source_type, :source_url, :update_check_url, :last_update_check,
-            :update_available, :latest_version, :installation_type, :permissions)
-            """)
-            
-            await db.execute(plugin_stmt, {
+            result = await db.execute(INSERT_PLUGIN, {
                 'id': plugin_id,
                 'name': self.PLUGIN_DATA['name'],
                 'description': self.PLUGIN_DATA['description'],
@@ -346,7 +689,6 @@ class NetworkEyesLifecycleManager:
                 'status': 'activated',
                 'official': self.PLUGIN_DATA['official'],
                 'author': self.PLUGIN_DATA['author'],
-                'last_updated': current_time,
                 'compatibility': self.PLUGIN_DATA['compatibility'],
                 'downloads': 0,
                 'scope': self.PLUGIN_DATA['scope'],
@@ -354,11 +696,9 @@ class NetworkEyesLifecycleManager:
                 'bundle_location': self.PLUGIN_DATA['bundle_location'],
                 'is_local': self.PLUGIN_DATA['is_local'],
                 'long_description': self.PLUGIN_DATA['long_description'],
-                'config_fields': json.dumps({}),
+                'config_fields': self._plugin_config_fields_json,
                 'messages': None,
                 'dependencies': None,
-                'created_at': current_time,
-                'updated_at': current_time,
                 'user_id': user_id,
                 'plugin_slug': plugin_slug,
                 'source_type': self.PLUGIN_DATA['source_type'],
@@ -368,26 +708,14 @@ class NetworkEyesLifecycleManager:
                 'update_available': self.PLUGIN_DATA['update_available'],
                 'latest_version': self.PLUGIN_DATA['latest_version'],
                 'installation_type': self.PLUGIN_DATA['installation_type'],
-                'permissions': json.dumps(self.PLUGIN_DATA['permissions'])
+                'permissions': self._plugin_permissions_json
             })
+            plugin_id = result.scalar_one()
             
-            modules_created = []
-            for module_data in self.MODULE_DATA:
-                module_id = f"{user_id}_{plugin_slug}_{module_data['name']}"
-                
-                module_stmt = text("""
-                INSERT INTO module
-                (id, plugin_id, name, display_name, description, icon, category,
-                enabled, priority, props, config_fields, messages, required_services,
-                dependencies, layout, tags, created_at, updated_at, user_id)
-                VALUES
-                (:id, :plugin_id, :name, :display_name, :description, :icon, :category,
-                :enabled, :priority, :props, :config_fields, :messages, :required_services,
-                :dependencies, :layout, :tags, :created_at, :updated_at, :user_id)
-                """)
-                
-                await db.execute(module_stmt, {
-                    'id': module_id,
+            # Build all module rows up front so they go out as a single executemany
+            module_params = [
+                {
+                    'id': f"{user_id}_{plugin_slug}_{module_data['name']}",
                     'plugin_id': plugin_id,
                     'name': module_data['name'],
                     'display_name': module_data['display_name'],
@@ -396,19 +724,22 @@ class NetworkEyesLifecycleManager:
                     'category': module_data['category'],
                     'enabled': True,
                     'priority': module_data['priority'],
-                    'props': json.dumps(module_data['props']),
-                    'config_fields': json.dumps(module_data['config_fields']),
-                    'messages': json.dumps(module_data['messages']),
-                    'required_services': json.dumps(module_data['required_services']),
-                    'dependencies': json.dumps(module_data['dependencies']),
-                    'layout': json.dumps(module_data['layout']),
-                    'tags': json.dumps(module_data['tags']),
-                    'created_at': current_time,
-                    'updated_at': current_time,
+                    'props': module_json['props'],
+                    'config_fields': module_json['config_fields'],
+                    'messages': module_json['messages'],
+                    'required_services': module_json['required_services'],
+                    'dependencies': module_json['dependencies'],
+                    'layout': module_json['layout'],
+                    'tags': module_json['tags'],
                     'user_id': user_id
-                })
-                
-                modules_created.append(module_id)
+                }
+                for module_data, module_json in zip(self.MODULE_DATA, self._module_json)
+            ]
+            
+            modules_created = []
+            if module_params:
+                result = await db.execute(INSERT_MODULES, module_params)
+                modules_created = list(result.scalars().all())
             
             logger.info(f"Created database records for plugin {plugin_id} with {len(modules_created)} modules")
             return {'success': True, 'plugin_id': plugin_id, 'modules_created': modules_created}
@@ -417,33 +748,39 @@ class NetworkEyesLifecycleManager:
             logger.error(f"Error creating database records: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _supports_delete_cte(self, db: AsyncSession) -> bool:
+        """Check if the database supports DELETE ... RETURNING inside a CTE (PostgreSQL only)"""
+        try:
+            return db.get_bind().dialect.name == 'postgresql'
+        except Exception:
+            return False
+    
     async def _delete_database_records(self, user_id: str, plugin_id: str, db: AsyncSession) -> Dict[str, Any]:
         """Delete plugin and module records from database"""
         try:
-            module_delete_stmt = text("""
-            DELETE FROM module 
-            WHERE plugin_id = :plugin_id AND user_id = :user_id
-            """)
-            
-            module_result = await db.execute(module_delete_stmt, {
-                'plugin_id': plugin_id,
-                'user_id': user_id
-            })
-            
-            deleted_modules = module_result.rowcount
-            
-            plugin_delete_stmt = text("""
-            DELETE FROM plugin 
-            WHERE id = :plugin_id AND user_id = :user_id
-            """)
-            
-            plugin_result = await db.execute(plugin_delete_stmt, {
+            delete_params = {
                 'plugin_id': plugin_id,
                 'user_id': user_id
-            })
+            }
             
-            if plugin_result.rowcount == 0:
-                return {'success': False, 'error': 'Plugin not found or not owned by user'}
+            if self._supports_delete_cte(db):
+                # Delete modules and plugin in a single round-trip
+                delete_result = await db.execute(DELETE_PLUGIN_WITH_MODULES, delete_params)
+                
+                delete_row = delete_result.fetchone()
+                if delete_row is None:
+                    return {'success': False, 'error': 'Plugin not found or not owned by user'}
+                
+                deleted_modules = delete_row.deleted_modules
+            else:
+                module_result = await db.execute(DELETE_MODULES, delete_params)
+                
+                deleted_modules = module_result.rowcount
+                
+                plugin_result = await db.execute(DELETE_PLUGIN, delete_params)
+                
+                if plugin_result.rowcount == 0:
+                    return {'success': False, 'error': 'Plugin not found or not owned by user'}
             
             logger.info(f"Deleted database records for plugin {plugin_id} ({deleted_modules} modules)")
             return {'success': True, 'deleted_modules': deleted_modules}
@@ -470,9 +807,8 @@ class NetworkEyesLifecycleManager:
             
             metadata_file = plugin_dir / "plugin_metadata.json"
             try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
-                    
+                metadata = json_loads(await asyncio.to_thread(metadata_file.read_bytes))
+                
                 if metadata.get('installed_for_user') != user_id:
                     return {
                         'valid': False,
@@ -491,33 +827,29 @@ class NetworkEyesLifecycleManager:
             logger.error(f"Error validating installation: {e}")
             return {'valid': False, 'error': str(e)}
     
+    def _summarize_modules(self, actual_modules: int, enabled_modules: int) -> Dict[str, Any]:
+        """Build the module status summary from module counts"""
+        expected_modules = len(self.MODULE_DATA)
+        return {
+            'expected_count': expected_modules,
+            'actual_count': actual_modules,
+            'enabled_count': enabled_modules,
+            'all_loaded': actual_modules == expected_modules,
+            'all_enabled': enabled_modules == actual_modules
+        }
+    
     async def _check_modules_status(self, user_id: str, plugin_id: str, db: AsyncSession) -> Dict[str, Any]:
-        """Check status of plugin modules"""
+        """Check status of plugin modules, including the per-module list"""
         try:
-            module_query = text("""
-            SELECT id, name, enabled 
-            FROM module 
-            WHERE plugin_id = :plugin_id AND user_id = :user_id
-            """)
-            
-            result = await db.execute(module_query, {
+            result = await db.execute(SELECT_MODULES, {
                 'plugin_id': plugin_id,
                 'user_id': user_id
             })
             
             modules = result.fetchall()
-            expected_modules = len(self.MODULE_DATA)
-            actual_modules = len(modules)
-            enabled_modules = sum(1 for m in modules if m.enabled)
-            
-            return {
-                'expected_count': expected_modules,
-                'actual_count': actual_modules,
-                'enabled_count': enabled_modules,
-                'all_loaded': actual_modules == expected_modules,
-                'all_enabled': enabled_modules == actual_modules,
-                'modules': [{'id': m.id, 'name': m.name, 'enabled': m.enabled} for m in modules]
-            }
+            modules_status = self._summarize_modules(len(modules), sum(1 for m in modules if m.enabled))
+            modules_status['modules'] = [{'id': m.id, 'name': m.name, 'enabled': m.enabled} for m in modules]
+            return modules_status
             
         except Exception as e:
             logger.error(f"Error checking modules status: {e}")
@@ -525,11 +857,17 @@ class NetworkEyesLifecycleManager:
     
     async def _cleanup_user_directory(self, plugin_dir: Path):
         """Remove plugin directory and contents"""
+        if self.shared_metadata_file.is_relative_to(plugin_dir):
+            logger.error(f"Refusing to remove shared plugin storage: {plugin_dir}")
+            return
+        
         try:
-            if plugin_dir.exists():
-                shutil.rmtree(plugin_dir)
-                logger.info(f"Cleaned up plugin directory: {plugin_dir}")
-                
+            await asyncio.to_thread(shutil.rmtree, plugin_dir)
+            logger.info(f"Cleaned up plugin directory: {plugin_dir}")
+            
+        except FileNotFoundError:
+            # Already removed, cleanup is idempotent
+            pass
         except Exception as e:
             logger.error(f"Error cleaning up plugin directory: {e}")
 
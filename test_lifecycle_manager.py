@@ -8,6 +8,7 @@ it works correctly with the new multi-user plugin system.
 
 import asyncio
 import json
+import os
 import tempfile
 import shutil
 from pathlib import Path
@@ -33,11 +34,29 @@ class MockAsyncSession:
         if "INSERT INTO plugin" in query_str:
             plugin_id = params['id']
             self.data['plugins'][plugin_id] = params
-            return MockResult(rowcount=1)
+            return MockResult(rowcount=1, scalars_data=[plugin_id])
         elif "INSERT INTO module" in query_str:
-            module_id = params['id']
-            self.data['modules'][module_id] = params
-            return MockResult(rowcount=1)
+            # Module rows are inserted as a batch (executemany)
+            rows = params if isinstance(params, list) else [params]
+            for row in rows:
+                self.data['modules'][row['id']] = row
+            return MockResult(rowcount=len(rows), scalars_data=[row['id'] for row in rows])
+        elif "DELETE FROM module" in query_str and 'user_ids' in params:
+            # Batch delete across users
+            deleted = 0
+            for module_id in list(self.data['modules'].keys()):
+                if self.data['modules'][module_id]['user_id'] in params['user_ids']:
+                    del self.data['modules'][module_id]
+                    deleted += 1
+            return MockResult(rowcount=deleted)
+        elif "DELETE FROM plugin" in query_str and 'user_ids' in params:
+            deleted = []
+            for plugin_id in list(self.data['plugins'].keys()):
+                plugin_data = self.data['plugins'][plugin_id]
+                if plugin_data['user_id'] in params['user_ids'] and plugin_data['plugin_slug'] == params['plugin_slug']:
+                    del self.data['plugins'][plugin_id]
+                    deleted.append(MockRow({'id': plugin_id, 'user_id': plugin_data['user_id']}))
+            return MockResult(rowcount=len(deleted), fetchall_data=deleted)
         elif "DELETE FROM module" in query_str:
             deleted = 0
             for module_id in list(self.data['modules'].keys()):
@@ -51,18 +70,28 @@ class MockAsyncSession:
                 del self.data['plugins'][plugin_id]
                 return MockResult(rowcount=1)
             return MockResult(rowcount=0)
-        elif "SELECT" in query_str and "plugin" in query_str:
+        elif "SELECT" in query_str and "module_count" in query_str:
+            # Plugin status joined with its module counts
             plugin_id = f"{params['user_id']}_{params['plugin_slug']}"
-            if plugin_id in self.data['plugins']:
-                plugin_data = self.data['plugins'][plugin_id]
-                return MockResult(fetchone_data=MockRow(plugin_data))
-            return MockResult(fetchone_data=None)
-        elif "SELECT" in query_str and "module" in query_str:
+            if plugin_id not in self.data['plugins']:
+                return MockResult(fetchone_data=None)
+            modules = [m for m in self.data['modules'].values() if m['plugin_id'] == plugin_id]
+            status_data = dict(self.data['plugins'][plugin_id],
+                               module_count=len(modules),
+                               enabled_count=sum(1 for m in modules if m['enabled']))
+            return MockResult(fetchone_data=MockRow(status_data))
+        elif "SELECT" in query_str and "FROM module" in query_str:
             modules = []
             for module_id, module_data in self.data['modules'].items():
                 if module_data['plugin_id'] == params['plugin_id']:
                     modules.append(MockRow(module_data))
             return MockResult(fetchall_data=modules)
+        elif "SELECT" in query_str and "plugin" in query_str:
+            plugin_id = f"{params['user_id']}_{params['plugin_slug']}"
+            if plugin_id in self.data['plugins']:
+                plugin_data = self.data['plugins'][plugin_id]
+                return MockResult(fetchone_data=MockRow(plugin_data))
+            return MockResult(fetchone_data=None)
         
         return MockResult()
     
@@ -74,19 +103,47 @@ class MockAsyncSession:
         """Mock rollback method"""
         self.rolled_back = True
 
+class CountingMockAsyncSession(MockAsyncSession):
+    """Mock database session that counts queries and can delay or fail them"""
+    
+    def __init__(self):
+        super().__init__()
+        self.execute_calls = 0
+        self.delay = 0
+        self.fail = False
+    
+    async def execute(self, query, params=None):
+        """Count the query, then delay or fail it if requested"""
+        self.execute_calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return await super().execute(query, params)
+
 class MockResult:
     """Mock database result"""
     
-    def __init__(self, rowcount=0, fetchone_data=None, fetchall_data=None):
+    def __init__(self, rowcount=0, fetchone_data=None, fetchall_data=None, scalars_data=None):
         self.rowcount = rowcount
         self._fetchone_data = fetchone_data
         self._fetchall_data = fetchall_data or []
+        self._scalars_data = scalars_data or []
     
     def fetchone(self):
         return self._fetchone_data
     
     def fetchall(self):
         return self._fetchall_data
+    
+    def scalar_one(self):
+        return self._scalars_data[0]
+    
+    def scalars(self):
+        return MockResult(fetchall_data=self._scalars_data)
+    
+    def all(self):
+        return self._fetchall_data
 
 class MockRow:
     """Mock database row"""
@@ -97,6 +154,25 @@ class MockRow:
 
 logger = structlog.get_logger()
 
+# Host application plugin/module tables, for tests that run against a real SQLite database
+SQLITE_SCHEMA = [
+    """CREATE TABLE plugin (
+        id TEXT PRIMARY KEY, name TEXT, description TEXT, version TEXT, type TEXT, enabled BOOLEAN,
+        icon TEXT, category TEXT, status TEXT, official BOOLEAN, author TEXT, last_updated TEXT,
+        compatibility TEXT, downloads INTEGER, scope TEXT, bundle_method TEXT, bundle_location TEXT,
+        is_local BOOLEAN, long_description TEXT, config_fields TEXT, messages TEXT, dependencies TEXT,
+        created_at TEXT, updated_at TEXT, user_id TEXT, plugin_slug TEXT, source_type TEXT,
+        source_url TEXT, update_check_url TEXT, last_update_check TEXT, update_available BOOLEAN,
+        latest_version TEXT, installation_type TEXT, permissions TEXT
+    )""",
+    """CREATE TABLE module (
+        id TEXT PRIMARY KEY, plugin_id TEXT, name TEXT, display_name TEXT, description TEXT, icon TEXT,
+        category TEXT, enabled BOOLEAN, priority INTEGER, props TEXT, config_fields TEXT, messages TEXT,
+        required_services TEXT, dependencies TEXT, layout TEXT, tags TEXT, created_at TEXT,
+        updated_at TEXT, user_id TEXT
+    )"""
+]
+
 class NetworkEyesLifecycleManagerTester:
     """Test suite for NetworkEyes lifecycle manager"""
     
@@ -181,6 +257,21 @@ class NetworkEyesLifecycleManagerTester:
             # Test 5: File Operations
             await self._test_file_operations(manager)
             
+            # Test 6: Batch Deletion (legacy manager)
+            await self._test_batch_deletion()
+            
+            # Test 7: Module Status Details (legacy manager)
+            await self._test_module_status_details()
+            
+            # Test 8: Multi-Module Install (both managers, real SQLite database)
+            await self._test_multi_module_install()
+            
+            # Test 9: Existing Plugin Cache
+            await self._test_existing_plugin_cache(manager)
+            
+            # Test 10: Archive Extraction (legacy manager, cross-filesystem copy path)
+            await self._test_archive_extraction()
+            
             # Compile results
             passed_tests = sum(1 for result in self.test_results if result['passed'])
             total_tests = len(self.test_results)
@@ -377,6 +468,304 @@ class NetworkEyesLifecycleManagerTester:
                 'details': {},
                 'error': str(e)
             })
+    
+    async def _test_batch_deletion(self):
+        """Test batch deletion for a mix of installed, leftover and unknown users"""
+        try:
+            from lifecycle_manager_old import NetworkEyesLifecycleManager as LegacyLifecycleManager
+            manager = LegacyLifecycleManager(str(self.temp_dir))
+            plugin_slug = manager.PLUGIN_DATA['plugin_slug']
+            db = MockAsyncSession()
+            
+            installed_users = ['batch_user_1', 'batch_user_2']
+            leftover_user = 'batch_user_3'  # Directory left by a failed install, no plugin row
+            unknown_user = 'batch_user_4'
+            
+            for user_id in installed_users:
+                plugin_id = f"{user_id}_{plugin_slug}"
+                db.data['plugins'][plugin_id] = {'id': plugin_id, 'user_id': user_id, 'plugin_slug': plugin_slug}
+                module_id = f"{plugin_id}_ComponentNetworkStatus"
+                db.data['modules'][module_id] = {'id': module_id, 'plugin_id': plugin_id, 'user_id': user_id}
+            
+            user_dirs = [self.temp_dir / user_id / plugin_slug for user_id in installed_users + [leftover_user]]
+            for user_dir in user_dirs:
+                user_dir.mkdir(parents=True)
+            
+            result = await manager.delete_plugins(installed_users + [leftover_user, unknown_user, 'batch_user_1'], db)
+            
+            success = (
+                result.get('success', False)
+                and sorted(result['plugin_ids']) == [f"{user_id}_{plugin_slug}" for user_id in installed_users]
+                and result['deleted_modules'] == len(installed_users)
+                and result['not_found'] == [leftover_user, unknown_user]
+                and not db.data['plugins']
+                and not any(user_dir.exists() for user_dir in user_dirs)
+            )
+            
+            self.test_results.append({
+                'test_name': 'Batch Deletion',
+                'passed': success,
+                'details': result,
+                'error': None if success else result.get('error', 'Unexpected batch deletion result')
+            })
+            
+            if success:
+                logger.info("✓ Batch deletion test passed")
+            else:
+                logger.error(f"✗ Batch deletion test failed: {result}")
+            
+        except Exception as e:
+            logger.error(f"✗ Batch deletion test error: {e}")
+            self.test_results.append({
+                'test_name': 'Batch Deletion',
+                'passed': False,
+                'details': {},
+                'error': str(e)
+            })
+    
+    async def _test_module_status_details(self):
+        """Test that plugin status lists modules only when include_modules is set"""
+        try:
+            from lifecycle_manager_old import NetworkEyesLifecycleManager as LegacyLifecycleManager
+            manager = LegacyLifecycleManager(str(self.temp_dir))
+            plugin_slug = manager.PLUGIN_DATA['plugin_slug']
+            db = MockAsyncSession()
+            
+            user_id = 'status_user'
+            plugin_id = f"{user_id}_{plugin_slug}"
+            db.data['plugins'][plugin_id] = {
+                'id': plugin_id, 'name': manager.PLUGIN_DATA['name'], 'version': manager.PLUGIN_DATA['version'],
+                'enabled': True, 'created_at': None, 'updated_at': None,
+                'user_id': user_id, 'plugin_slug': plugin_slug
+            }
+            for module_data in manager.MODULE_DATA:
+                module_id = f"{plugin_id}_{module_data['name']}"
+                db.data['modules'][module_id] = {
+                    'id': module_id, 'plugin_id': plugin_id, 'name': module_data['name'],
+                    'enabled': True, 'user_id': user_id
+                }
+            (self.temp_dir / user_id / plugin_slug).mkdir(parents=True)
+            
+            summary = await manager.get_plugin_status(user_id, db)
+            detailed = await manager.get_plugin_status(user_id, db, include_modules=True)
+            
+            expected_names = [module_data['name'] for module_data in manager.MODULE_DATA]
+            success = (
+                summary.get('status') == 'healthy'
+                and 'modules' not in summary['modules_status']
+                and summary['modules_status']['actual_count'] == len(expected_names)
+                and detailed.get('status') == 'healthy'
+                and [m['name'] for m in detailed['modules_status'].get('modules', [])] == expected_names
+                and {k: v for k, v in detailed['modules_status'].items() if k != 'modules'} == summary['modules_status']
+            )
+            
+            self.test_results.append({
+                'test_name': 'Module Status Details',
+                'passed': success,
+                'details': {'summary': summary, 'detailed': detailed},
+                'error': None if success else 'Unexpected module status details'
+            })
+            
+            if success:
+                logger.info("✓ Module status details test passed")
+            else:
+                logger.error(f"✗ Module status details test failed: {summary} / {detailed}")
+            
+        except Exception as e:
+            logger.error(f"✗ Module status details test error: {e}")
+            self.test_results.append({
+                'test_name': 'Module Status Details',
+                'passed': False,
+                'details': {},
+                'error': str(e)
+            })
+    
+    async def _test_multi_module_install(self):
+        """Test installing a plugin with several modules against a real SQLite database"""
+        try:
+            from sqlalchemy import text
+            from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+            from lifecycle_manager import NetworkEyesLifecycleManager
+            from lifecycle_manager_old import NetworkEyesLifecycleManager as LegacyLifecycleManager
+            
+            details = {}
+            for label, manager_class in (('new', NetworkEyesLifecycleManager), ('legacy', LegacyLifecycleManager)):
+                engine = create_async_engine('sqlite+aiosqlite:///:memory:')
+                async with engine.begin() as conn:
+                    for statement in SQLITE_SCHEMA:
+                        await conn.execute(text(statement))
+                
+                manager = manager_class(str(self.temp_dir / f"multi_module_{label}"))
+                module_data = manager.module_data if label == 'new' else manager.MODULE_DATA
+                
+                # A second module makes SQLAlchemy send the module INSERT as an executemany
+                module_data.append(dict(module_data[0], name='ComponentNetworkStatusSecondary'))
+                manager._module_json.append(dict(manager._module_json[0]))
+                
+                user_id = f"multi_module_user_{label}"
+                async with AsyncSession(engine) as db:
+                    result = await manager.install_plugin(user_id, db)
+                    module_names = (await db.execute(
+                        text("SELECT name FROM module WHERE user_id = :user_id ORDER BY name"),
+                        {'user_id': user_id}
+                    )).scalars().all()
+                await engine.dispose()
+                
+                details[label] = {'result': result, 'module_names': module_names}
+            
+            expected_names = ['ComponentNetworkStatus', 'ComponentNetworkStatusSecondary']
+            success = all(
+                detail['result'].get('success', False)
+                and len(detail['result']['modules_created']) == len(expected_names)
+                and detail['module_names'] == expected_names
+                for detail in details.values()
+            )
+            
+            self.test_results.append({
+                'test_name': 'Multi-Module Install',
+                'passed': success,
+                'details': details,
+                'error': None if success else 'Installing several modules failed'
+            })
+            
+            if success:
+                logger.info("✓ Multi-module install test passed")
+            else:
+                logger.error(f"✗ Multi-module install test failed: {details}")
+            
+        except Exception as e:
+            logger.error(f"✗ Multi-module install test error: {e}")
+            self.test_results.append({
+                'test_name': 'Multi-Module Install',
+                'passed': False,
+                'details': {},
+                'error': str(e)
+            })
+    
+    async def _test_existing_plugin_cache(self, manager):
+        """Test caching, invalidation and error handling of _check_existing_plugin"""
+        try:
+            plugin_slug = manager.plugin_data['plugin_slug']
+            checks = {}
+            
+            def seed(db, user_id):
+                plugin_id = f"{user_id}_{plugin_slug}"
+                db.data['plugins'][plugin_id] = {
+                    'id': plugin_id, 'name': manager.plugin_data['name'], 'version': manager.plugin_data['version'],
+                    'enabled': True, 'created_at': None, 'updated_at': None,
+                    'user_id': user_id, 'plugin_slug': plugin_slug
+                }
+            
+            # Repeated lookups within the TTL hit the cache, and callers can't alter the cached entry
+            db = CountingMockAsyncSession()
+            seed(db, 'cache_user_hit')
+            first = await manager._check_existing_plugin('cache_user_hit', db)
+            first['plugin_info']['name'] = 'changed by caller'
+            second = await manager._check_existing_plugin('cache_user_hit', db)
+            checks['hit_within_ttl'] = db.execute_calls == 1 and second['exists']
+            checks['copy_returned'] = second['plugin_info']['name'] == manager.plugin_data['name']
+            
+            # Committing through _commit invalidates the cached entry
+            db.data['plugins'].clear()
+            await manager._commit(db, 'cache_user_hit')
+            after_commit = await manager._check_existing_plugin('cache_user_hit', db)
+            checks['invalidated_by_commit'] = db.execute_calls == 2 and not after_commit['exists']
+            
+            # Failed lookups are not cached
+            db = CountingMockAsyncSession()
+            seed(db, 'cache_user_error')
+            db.fail = True
+            failed = await manager._check_existing_plugin('cache_user_error', db)
+            db.fail = False
+            recovered = await manager._check_existing_plugin('cache_user_error', db)
+            checks['errors_not_cached'] = 'error' in failed and recovered['exists'] and db.execute_calls == 2
+            
+            # A lookup still running when the entry is invalidated is not cached
+            db = CountingMockAsyncSession()
+            db.delay = 0.05
+            lookup = asyncio.create_task(manager._check_existing_plugin('cache_user_inflight', db))
+            await asyncio.sleep(0.01)
+            manager._invalidate_existing_plugin('cache_user_inflight')
+            stale = await lookup
+            seed(db, 'cache_user_inflight')
+            fresh = await manager._check_existing_plugin('cache_user_inflight', db)
+            checks['inflight_dropped'] = not stale['exists'] and fresh['exists'] and db.execute_calls == 2
+            
+            success = all(checks.values())
+            self.test_results.append({
+                'test_name': 'Existing Plugin Cache',
+                'passed': success,
+                'details': checks,
+                'error': None if success else f"Failed checks: {[name for name, ok in checks.items() if not ok]}"
+            })
+            
+            if success:
+                logger.info("✓ Existing plugin cache test passed")
+            else:
+                logger.error(f"✗ Existing plugin cache test failed: {checks}")
+            
+        except Exception as e:
+            logger.error(f"✗ Existing plugin cache test error: {e}")
+            self.test_results.append({
+                'test_name': 'Existing Plugin Cache',
+                'passed': False,
+                'details': {},
+                'error': str(e)
+            })
+    
+    async def _test_archive_extraction(self):
+        """Test copying plugin files through the in-memory archive used across filesystems"""
+        try:
+            from lifecycle_manager_old import NetworkEyesLifecycleManager as LegacyLifecycleManager
+            manager = LegacyLifecycleManager(str(self.temp_dir / "archive_extraction"))
+            source_dir = Path(__file__).parent
+            target_dir = self.temp_dir / "archive_extraction" / "archive_user" / manager.PLUGIN_DATA['plugin_slug']
+            target_dir.mkdir(parents=True)
+            checks = {}
+            
+            # Start from a hardlinked copy, then force the extract path as if the target were on another device
+            manager._same_filesystem = lambda source, target: True
+            linked = await manager._copy_plugin_files('archive_user', target_dir)
+            manager._same_filesystem = lambda source, target: False
+            
+            manifest = manager._get_source_manifest(source_dir)
+            copied_paths = [target_dir / name for name in manifest['files'] + manifest['dirs']]
+            extra_file = target_dir / manifest['dirs'][0] / "user_added.txt"
+            extra_file.write_text("kept unless updating")
+            
+            extracted = await manager._copy_plugin_files('archive_user', target_dir)
+            checks['extracted'] = linked.get('success', False) and extracted.get('success', False)
+            checks['entries_present'] = all(path.exists() for path in copied_paths)
+            checks['merged_without_update'] = extra_file.exists()
+            checks['links_replaced'] = not any(
+                os.path.samefile(source_dir / name, target_dir / name) for name in manifest['files']
+            )
+            
+            updated = await manager._copy_plugin_files('archive_user', target_dir, update=True)
+            checks['update_replaces_dirs'] = updated.get('success', False) and not extra_file.exists()
+            checks['source_untouched'] = not (source_dir / manifest['dirs'][0] / "user_added.txt").exists()
+            
+            success = all(checks.values())
+            self.test_results.append({
+                'test_name': 'Archive Extraction',
+                'passed': success,
+                'details': checks,
+                'error': None if success else f"Failed checks: {[name for name, ok in checks.items() if not ok]}"
+            })
+            
+            if success:
+                logger.info("✓ Archive extraction test passed")
+            else:
+                logger.error(f"✗ Archive extraction test failed: {checks}")
+            
+        except Exception as e:
+            logger.error(f"✗ Archive extraction test error: {e}")
+            self.test_results.append({
+                'test_name': 'Archive Extraction',
+                'passed': False,
+                'details': {},
+                'error': str(e)
+            })
 
 
 async def main():